@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+
+from playlist_control import DEFAULT_HOST, DEFAULT_PORT, raise_fd_limit
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def open_connection(args):
+    if args.socket:
+        return await asyncio.open_unix_connection(args.socket)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def run_client(args, start_gate, ready, latencies, errors):
+    try:
+        reader, writer = await open_connection(args)
+    except OSError as e:
+        errors.append(f"connect: {e}")
+        return
+    finally:
+        ready.release()
+    request_args = json.loads(args.args)
+    await start_gate.wait()
+    try:
+        for i in range(args.requests):
+            line = json.dumps({'id': i, 'cmd': args.cmd, 'args': request_args}) + '\n'
+            started = time.perf_counter()
+            writer.write(line.encode('utf-8'))
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if not response.get('ok'):
+                errors.append(response.get('error'))
+    except (OSError, ValueError) as e:
+        errors.append(str(e))
+    finally:
+        writer.close()
+
+
+async def run_subscriber(args, start_gate, events, stop):
+    reader, writer = await open_connection(args)
+    writer.write(b'{"id":0,"cmd":"subscribe"}\n')
+    await reader.readline()
+    await start_gate.wait()
+    try:
+        while not stop.is_set():
+            try:
+                line = await asyncio.wait_for(reader.readline(), 0.1)
+            except asyncio.TimeoutError:
+                continue
+            if not line:
+                break
+            events.append(line)
+    finally:
+        writer.close()
+
+
+async def load_test(args):
+    latencies = []
+    errors = []
+    events = []
+    start_gate = asyncio.Event()
+    stop = asyncio.Event()
+    ready = asyncio.Semaphore(0)
+
+    subscribers = [asyncio.create_task(run_subscriber(args, start_gate, events, stop))
+                   for _ in range(args.subscribers)]
+    clients = [asyncio.create_task(run_client(args, start_gate, ready, latencies, errors))
+               for _ in range(args.clients)]
+    # Let every client connect (or fail to) before the clock starts
+    for _ in clients:
+        await ready.acquire()
+
+    started = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"Clients:     {args.clients} ({args.subscribers} subscribers)")
+    print(f"Requests:    {total} x '{args.cmd}' in {elapsed:.3f}s")
+    print(f"Throughput:  {total / elapsed if elapsed else 0:.0f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"Latency max: {(latencies[-1] if latencies else 0) * 1000:.2f} ms")
+    print(f"Events:      {len(events)}")
+    print(f"Errors:      {len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the playlist control server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="Connect to this Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=1000, help="Concurrent request clients")
+    parser.add_argument('--requests', type=int, default=100, help="Requests sent by each client")
+    parser.add_argument('--subscribers', type=int, default=0, help="Extra clients listening for events")
+    parser.add_argument('--cmd', default='status', help="Command every request sends")
+    parser.add_argument('--args', default='{}', help="JSON args sent with each request")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    asyncio.run(load_test(args))
+
+
+if __name__ == "__main__":
+    main()
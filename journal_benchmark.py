@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from playlist_journal import PlaylistJournal
+
+# Where removes and replaces land in the synthetic log:
+#   tail     within 100 songs of the end, so replay barely walks (best case)
+#   uniform  anywhere, as remove_song on an arbitrary title would log them
+WORKLOADS = ('tail', 'uniform')
+
+
+def edit_index(rng, size, workload):
+    if workload == 'tail':
+        return size - 1 - rng.randrange(min(size, 100))
+    return rng.randrange(size)
+
+
+def write_log(path, count, seed, workload):
+    """Write a synthetic log of count ops: 70% appends, 20% removes, 10% replaces"""
+    rng = random.Random(seed)
+    size = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for v in range(1, count + 1):
+            roll = rng.random()
+            if size and roll < 0.2:
+                op = {'op': 'remove', 'index': edit_index(rng, size, workload), 'title': ''}
+                size -= 1
+            elif size and roll < 0.3:
+                op = {'op': 'replace', 'index': edit_index(rng, size, workload),
+                      'title': f"Edited {v}", 'file_path': None}
+            else:
+                op = {'op': 'insert', 'index': size, 'title': f"Song {v}", 'file_path': None}
+                size += 1
+            op['v'] = v
+            f.write(json.dumps(op, separators=(',', ':')) + '\n')
+    return size
+
+
+def bench_replay(tmp, count, seed, workload):
+    path = os.path.join(tmp, f"{workload}.log")
+    expected = write_log(path, count, seed, workload)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    journal = PlaylistJournal(path)
+    started = time.perf_counter()
+    playlist = journal.recover("Benchmark")
+    elapsed = time.perf_counter() - started
+    journal.close()
+    playlist.journal = None
+
+    assert playlist.size == expected, (playlist.size, expected)
+    print(f"[{workload}] Replayed {count} ops ({size_mb:.1f} MB) in {elapsed:.3f}s")
+    print(f"[{workload}] Throughput: {count / elapsed:.0f} ops/s, final playlist size {playlist.size}")
+    return playlist
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark journal replay speed")
+    parser.add_argument('--ops', type=int, default=1000000, help="Logged ops to replay for the tail workload")
+    parser.add_argument('--uniform-ops', type=int, default=100000,
+                        help="Logged ops for the uniform workload, whose edits walk O(min(i, n - i)) songs each")
+    parser.add_argument('--workload', choices=WORKLOADS + ('both',), default='both')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        playlist = None
+        if args.workload in ('tail', 'both'):
+            playlist = bench_replay(tmp, args.ops, args.seed, 'tail')
+        if args.workload in ('uniform', 'both'):
+            playlist = bench_replay(tmp, args.uniform_ops, args.seed, 'uniform')
+
+        # In-memory history alone: undo/redo should not grow with playlist size
+        for i in range(1000):
+            playlist.add_song(f"Extra {i}")
+        started = time.perf_counter()
+        for _ in range(1000):
+            playlist.undo()
+        for _ in range(1000):
+            playlist.redo()
+        elapsed = time.perf_counter() - started
+        print(f"Undo/redo: {elapsed / 2000 * 1e6:.2f} us per op")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import argparse
 import random
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import pygame
@@ -21,6 +23,9 @@ except Exception as e:
     print(f"Audio initialization failed: {e}")
     AUDIO_AVAILABLE = False
 
+# Edits kept for undo; older ones are dropped so history memory stays bounded
+UNDO_HISTORY_LIMIT = 1000
+
 class Song:
     def __init__(self, title, file_path=None):
         self.title = title
@@ -29,42 +34,163 @@ class Song:
         self.next = None
 
 class Playlist:
-    def __init__(self, name):
+    def __init__(self, name, history_limit=UNDO_HISTORY_LIMIT):
         self.name = name
         self.head = None
         self.tail = None
+        self.size = 0
+        # Undo/redo entries keep node references so either direction is O(1):
+        # ('insert' | 'remove', index, song, prev, next) or ('replace', index, old, new)
+        self.undo_stack = deque(maxlen=history_limit)
+        self.redo_stack = deque(maxlen=history_limit)
+        # Optional PlaylistJournal that records every mutation
+        self.journal = None
 
     def add_song(self, title, file_path=None):
         new_song = Song(title, file_path)
-        if not self.head:
-            self.head = self.tail = new_song
-        else:
-            self.tail.next = new_song
-            new_song.prev = self.tail
-            self.tail = new_song
+        entry = ('insert', self.size, new_song, self.tail, None)
+        self._link(new_song, self.tail, None)
+        self._push(entry)
 
     def remove_song(self, title):
         current = self.head
+        index = 0
         while current:
             if current.title == title:
-                if current.prev:
-                    current.prev.next = current.next
-                else:
-                    self.head = current.next
-                if current.next:
-                    current.next.prev = current.prev
-                else:
-                    self.tail = current.prev
+                entry = ('remove', index, current, current.prev, current.next)
+                self._unlink(current)
+                self._push(entry)
                 return f"{title} removed from playlist."
             current = current.next
+            index += 1
         return f"{title} not found."
 
     def rearrange_song(self, old_title, new_title):
-        removed = self.remove_song(old_title)
-        if "removed" in removed:
-            self.add_song(new_title)
-            return f"{old_title} replaced with {new_title}."
-        return removed
+        current = self.head
+        index = 0
+        while current:
+            if current.title == old_title:
+                # Replace in place so the song keeps its position
+                new_song = Song(new_title)
+                self._swap(current, new_song)
+                self._push(('replace', index, current, new_song))
+                return f"{old_title} replaced with {new_title}."
+            current = current.next
+            index += 1
+        return f"{old_title} not found."
+
+    def undo(self):
+        if not self.undo_stack:
+            return "Nothing to undo."
+        entry = self.undo_stack.pop()
+        self._apply(entry, reverse=True)
+        self.redo_stack.append(entry)
+        return f"Undid {entry[0]} at position {entry[1] + 1}."
+
+    def redo(self):
+        if not self.redo_stack:
+            return "Nothing to redo."
+        entry = self.redo_stack.pop()
+        self._apply(entry, reverse=False)
+        self.undo_stack.append(entry)
+        return f"Redid {entry[0]} at position {entry[1] + 1}."
+
+    def apply_op(self, op):
+        """Apply a positional journal op without touching history or the journal"""
+        kind = op['op']
+        index = op['index']
+        if kind == 'insert':
+            if index == self.size:
+                prev, nxt = self.tail, None
+            else:
+                nxt = self._node_at(index)
+                prev = nxt.prev
+            self._link(Song(op['title'], op.get('file_path')), prev, nxt)
+        elif kind == 'remove':
+            self._unlink(self._node_at(index))
+        elif kind == 'replace':
+            self._swap(self._node_at(index), Song(op['title'], op.get('file_path')))
+        else:
+            raise ValueError(f"Unknown journal op: {kind}")
+
+    def _push(self, entry):
+        self.undo_stack.append(entry)
+        self.redo_stack.clear()
+        self._record(entry, reverse=False)
+
+    def _apply(self, entry, reverse):
+        kind = entry[0]
+        if kind == 'replace':
+            _, _, old, new = entry
+            if reverse:
+                self._swap(new, old)
+            else:
+                self._swap(old, new)
+        else:
+            _, _, song, prev, nxt = entry
+            if (kind == 'insert') != reverse:
+                self._link(song, prev, nxt)
+            else:
+                self._unlink(song)
+        self._record(entry, reverse)
+
+    def _record(self, entry, reverse):
+        if self.journal is None:
+            return
+        kind, index = entry[0], entry[1]
+        if kind == 'replace':
+            song = entry[2] if reverse else entry[3]
+            op = {'op': 'replace', 'index': index, 'title': song.title, 'file_path': song.file_path}
+        else:
+            song = entry[2]
+            if reverse:
+                kind = 'remove' if kind == 'insert' else 'insert'
+            op = {'op': kind, 'index': index, 'title': song.title}
+            if kind == 'insert':
+                op['file_path'] = song.file_path
+        self.journal.record(self, op)
+
+    def _link(self, song, prev, nxt):
+        song.prev = prev
+        song.next = nxt
+        if prev:
+            prev.next = song
+        else:
+            self.head = song
+        if nxt:
+            nxt.prev = song
+        else:
+            self.tail = song
+        self.size += 1
+
+    def _unlink(self, song):
+        if song.prev:
+            song.prev.next = song.next
+        else:
+            self.head = song.next
+        if song.next:
+            song.next.prev = song.prev
+        else:
+            self.tail = song.prev
+        self.size -= 1
+
+    def _swap(self, old, new):
+        self._link(new, old.prev, old.next)
+        self.size -= 1
+
+    def _node_at(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(f"Position out of range: {index}")
+        # Walk from whichever end is closer
+        if index < self.size // 2:
+            current = self.head
+            for _ in range(index):
+                current = current.next
+        else:
+            current = self.tail
+            for _ in range(self.size - 1 - index):
+                current = current.prev
+        return current
 
     def get_all_songs(self):
         songs = []
@@ -270,18 +396,27 @@ class MusicPlayer:
         return (self.current_song_index - 1) % len(songs)
 
 class PlaylistGUI:
-    def __init__(self, root):
+    def __init__(self, root, journal_path=None):
         self.root = root
         self.root.title("Music Playlist Manager with Player")
         self.root.geometry("1000x700")
         self.root.configure(bg='#2c3e50')
         
-        self.playlist = Playlist("My Favorites")
+        self.journal = None
+        if journal_path:
+            from playlist_journal import PlaylistJournal
+            self.journal = PlaylistJournal(journal_path)
+            self.playlist = self.journal.recover("My Favorites")
+        else:
+            self.playlist = Playlist("My Favorites")
         self.music_player = MusicPlayer()
         self.music_player.playlist = self.playlist
         
         self.create_widgets()
-        self.setup_initial_songs()
+        if self.playlist.size:
+            self.log_output(f"Recovered {self.playlist.size} songs from {journal_path}")
+        else:
+            self.setup_initial_songs()
         self.update_playlist_display()
         
         # Initial output message
@@ -430,6 +565,21 @@ class PlaylistGUI:
                               bg='#e74c3c', fg='white', font=("Arial", 10, "bold"))
         remove_btn.pack(pady=5)
 
+        # Edit history section
+        history_frame = tk.LabelFrame(center_frame, text="Edit History", bg='#34495e', fg='white', font=("Arial", 10, "bold"))
+        history_frame.pack(fill='x', padx=10, pady=5)
+
+        history_buttons_frame = tk.Frame(history_frame, bg='#34495e')
+        history_buttons_frame.pack(pady=5)
+
+        undo_btn = tk.Button(history_buttons_frame, text="↶ Undo", command=self.undo_edit,
+                            bg='#7f8c8d', fg='white', font=("Arial", 10, "bold"), width=10)
+        undo_btn.pack(side='left', padx=5)
+
+        redo_btn = tk.Button(history_buttons_frame, text="↷ Redo", command=self.redo_edit,
+                            bg='#7f8c8d', fg='white', font=("Arial", 10, "bold"), width=10)
+        redo_btn.pack(side='left', padx=5)
+
         # Play options section
         play_frame = tk.LabelFrame(center_frame, text="Play Options", bg='#34495e', fg='white', font=("Arial", 10, "bold"))
         play_frame.pack(fill='x', padx=10, pady=5)
@@ -517,6 +667,16 @@ class PlaylistGUI:
         else:
             messagebox.showwarning("Warning", "Please enter a song title!")
 
+    def undo_edit(self):
+        result = self.playlist.undo()
+        self.update_playlist_display()
+        self.log_output(result)
+
+    def redo_edit(self):
+        result = self.playlist.redo()
+        self.update_playlist_display()
+        self.log_output(result)
+
     def play_selected_song(self, event=None):
         selection = self.playlist_listbox.curselection()
         if selection:
@@ -711,9 +871,21 @@ class PlaylistGUI:
         self.output_text.update()
 
 def main():
+    parser = argparse.ArgumentParser(description="Music Playlist Manager with Player")
+    parser.add_argument('--control-port', type=int, help="Serve the remote control API on this localhost TCP port")
+    parser.add_argument('--control-socket', help="Serve the remote control API on this Unix socket path")
+    parser.add_argument('--journal', help="Record playlist edits to this log file and recover from it on start")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = PlaylistGUI(root)
+    app = PlaylistGUI(root, journal_path=args.journal)
+    if args.control_port or args.control_socket:
+        from playlist_control import start_gui_control_server
+        server = start_gui_control_server(app, port=args.control_port, path=args.control_socket)
+        app.log_output(f"Control server listening on {server.address}")
     root.mainloop()
+    if app.journal:
+        app.journal.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,309 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Run headless: SDL's dummy driver needs no sound device, Tk is never started
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from music_playlist_adt import Playlist, MusicPlayer, generate_test_tone
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+# Needs several GB of memory, so it only runs when asked for with --large
+LARGE_SIZE = 10000000
+DEFAULT_DURATIONS = [1.0, 3.0, 10.0]
+# Cheap calls are repeated inside one measurement until roughly this many
+# songs have been walked, so small sizes are not lost in timer noise
+WORK_PER_SAMPLE = 1000000
+# Runs are only comparable when these were the same for both (unless --force)
+COMPARABLE_META = ('machine', 'python', 'repeat')
+# Differences here are worth a warning but never block a comparison:
+# CI runners and containers get a new hostname on every run
+NOTED_META = ('node',)
+
+
+def build_playlist(size):
+    playlist = Playlist("Benchmark")
+    for i in range(size):
+        playlist.add_song(f"Song {i}", f"song_{i}.wav")
+    return playlist
+
+
+def calls_for(size):
+    return max(1, min(1000, WORK_PER_SAMPLE // max(size, 1)))
+
+
+# Each benchmark takes the prepared playlist/player for a size and returns a
+# zero-argument callable to measure plus the number of calls it makes.
+# Callables must leave the playlist as they found it.
+
+def bench_remove_song(playlist, player, size):
+    # Worst case: the last song, so the whole list is scanned. Undo puts it back.
+    title = playlist.tail.title
+
+    def run():
+        playlist.remove_song(title)
+        playlist.undo()
+    return run, 1
+
+
+def bench_remove_missing(playlist, player, size):
+    def run():
+        playlist.remove_song("Not in playlist")
+    return run, 1
+
+
+def bench_get_all_songs(playlist, player, size):
+    calls = calls_for(size)
+
+    def run():
+        for _ in range(calls):
+            playlist.get_all_songs()
+    return run, calls
+
+
+def bench_play_shuffled(playlist, player, size):
+    def run():
+        playlist.play_shuffled()
+    return run, 1
+
+
+def bench_enable_shuffle(playlist, player, size):
+    def run():
+        player.enable_shuffle()
+    return run, 1
+
+
+def bench_get_next_index(playlist, player, size):
+    player.disable_shuffle()
+    calls = calls_for(size)
+
+    def run():
+        for _ in range(calls):
+            player.get_next_index()
+    return run, calls
+
+
+def bench_get_next_index_shuffled(playlist, player, size):
+    player.enable_shuffle()
+    calls = calls_for(size)
+
+    def run():
+        for _ in range(calls):
+            player.get_next_index()
+    return run, calls
+
+
+PLAYLIST_BENCHMARKS = {
+    'remove_song': bench_remove_song,
+    'remove_song_missing': bench_remove_missing,
+    'get_all_songs': bench_get_all_songs,
+    'play_shuffled': bench_play_shuffled,
+    'enable_shuffle': bench_enable_shuffle,
+    'get_next_index': bench_get_next_index,
+    'get_next_index_shuffled': bench_get_next_index_shuffled,
+}
+ALL_BENCHMARKS = ['add_song'] + list(PLAYLIST_BENCHMARKS) + ['generate_test_tone']
+
+
+def measure(run, calls, repeat):
+    """Time run() repeat times, then once more under tracemalloc for peak memory"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return times, peak_memory(run)
+
+
+def peak_memory(run):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def result(name, param, times, peak, calls):
+    best = min(times)
+    return {
+        'name': name,
+        'param': param,
+        'calls': calls,
+        'best_s': best,
+        'median_s': statistics.median(times),
+        'times_s': times,
+        'per_call_s': best / calls,
+        'peak_bytes': peak,
+    }
+
+
+def run_size(size, selected, repeat, report):
+    if 'add_song' in selected:
+        # Peak first and throw that copy away, so only one large playlist is alive
+        peak = peak_memory(lambda: build_playlist(size))
+        gc.collect()
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            playlist = build_playlist(size)
+            times.append(time.perf_counter() - started)
+            if len(times) < repeat:
+                del playlist
+        report(result('add_song', size, times, peak, size))
+    else:
+        playlist = build_playlist(size)
+
+    player = MusicPlayer()
+    player.playlist = playlist
+    for name, bench in PLAYLIST_BENCHMARKS.items():
+        if name not in selected:
+            continue
+        run, calls = bench(playlist, player, size)
+        times, peak = measure(run, calls, repeat)
+        report(result(name, size, times, peak, calls))
+
+
+def run_tone(duration, repeat, report):
+    paths = []
+
+    def run():
+        paths.append(generate_test_tone(frequency=440, duration=duration))
+    times, peak = measure(run, 1, repeat)
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+    report(result('generate_test_tone', duration, times, peak, 1))
+
+
+def mismatched_meta(baseline, current, keys):
+    """Return which of keys differ between the baseline's meta and current"""
+    return [key for key in keys if baseline['meta'].get(key) != current.get(key)]
+
+
+def compare(baseline, current, time_threshold, memory_threshold, min_time):
+    """Return a line for every case that got slower or larger beyond the thresholds.
+
+    A case only counts as slower when even its fastest repeat is slower than
+    the baseline's median by more than time_threshold, so a single noisy
+    sample on either side cannot trip the gate.
+    """
+    previous = {(r['name'], r['param']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        old = previous.get((r['name'], r['param']))
+        if old is None:
+            continue
+        case = f"{r['name']}[{r['param']}]"
+        # Sub-min_time cases are dominated by timer noise
+        if old['median_s'] >= min_time:
+            ratio = r['best_s'] / old['median_s']
+            if ratio > 1 + time_threshold:
+                regressions.append(f"{case}: time median {old['median_s']:.6f}s -> "
+                                   f"best {r['best_s']:.6f}s / median {r['median_s']:.6f}s ({ratio:.2f}x)")
+        if old['peak_bytes'] > 0:
+            ratio = r['peak_bytes'] / old['peak_bytes']
+            if ratio > 1 + memory_threshold:
+                regressions.append(f"{case}: peak memory {old['peak_bytes']} -> {r['peak_bytes']} bytes ({ratio:.2f}x)")
+    return regressions
+
+
+def format_bytes(count):
+    return f"{count / (1024 * 1024):.2f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the playlist ADT and player navigation")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Playlist sizes to run")
+    parser.add_argument('--large', action='store_true', help=f"Also run a {LARGE_SIZE:,}-song playlist")
+    parser.add_argument('--durations', type=float, nargs='+', default=DEFAULT_DURATIONS,
+                        help="Tone lengths in seconds for generate_test_tone")
+    parser.add_argument('--only', nargs='+', choices=ALL_BENCHMARKS, help="Run just these benchmarks")
+    parser.add_argument('--repeat', type=int, default=7, help="Timed runs per case")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for shuffles")
+    parser.add_argument('--output', help="Write JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', help="Baseline JSON from an earlier run to check for regressions")
+    parser.add_argument('--time-threshold', type=float, default=0.5,
+                        help="Allowed slowdown of the fastest repeat over the baseline median, 0.5 = 50%%")
+    parser.add_argument('--memory-threshold', type=float, default=0.1, help="Allowed peak memory growth")
+    parser.add_argument('--min-time', type=float, default=0.005,
+                        help="Ignore time changes for cases whose baseline median is under this many seconds")
+    parser.add_argument('--force', action='store_true',
+                        help="Compare even if machine, Python version or --repeat differ from the baseline")
+    args = parser.parse_args()
+
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'node': platform.node(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+    }
+    baseline = None
+    if args.compare:
+        # Check before spending minutes benchmarking against an unusable baseline
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key in mismatched_meta(baseline, meta, NOTED_META):
+            print(f"Warning: {key} is {baseline['meta'].get(key)!r} in baseline, {meta[key]!r} now",
+                  file=sys.stderr)
+        mismatched = mismatched_meta(baseline, meta, COMPARABLE_META)
+        for key in mismatched:
+            prefix = "Warning" if args.force else "Cannot compare"
+            print(f"{prefix}: {key} is {baseline['meta'].get(key)!r} in baseline, {meta[key]!r} now",
+                  file=sys.stderr)
+        if mismatched and not args.force:
+            print("Use --force to compare anyway.", file=sys.stderr)
+            sys.exit(2)
+
+    if args.large and LARGE_SIZE not in args.sizes:
+        args.sizes.append(LARGE_SIZE)
+    selected = set(args.only or ALL_BENCHMARKS)
+    random.seed(args.seed)
+    results = []
+
+    def report(r):
+        results.append(r)
+        print(f"{r['name']:<24} {r['param']:>10}  best {r['best_s']:.6f}s  "
+              f"median {r['median_s']:.6f}s  peak {format_bytes(r['peak_bytes'])}",
+              file=sys.stderr, flush=True)
+
+    if selected - {'generate_test_tone'}:
+        for size in args.sizes:
+            run_size(size, selected, args.repeat, report)
+            gc.collect()
+    if 'generate_test_tone' in selected:
+        for duration in args.durations:
+            run_tone(duration, args.repeat, report)
+
+    output = {'meta': meta, 'results': results}
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if baseline is not None:
+        regressions = compare(baseline, output, args.time_threshold, args.memory_threshold, args.min_time)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
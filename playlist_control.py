@@ -0,0 +1,547 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import math
+import os
+import queue
+import stat
+import threading
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Listen backlog large enough for a burst of thousands of connecting clients
+DEFAULT_BACKLOG = 4096
+# Longest request line accepted from a client
+MAX_LINE_BYTES = 64 * 1024
+# Subscribers that stop reading are dropped once this much output is queued
+MAX_SUBSCRIBER_BUFFER = 256 * 1024
+# Remote commands run per Tk tick; the rest wait so the GUI stays responsive
+MAX_CALLS_PER_TICK = 100
+# Remote edit messages written to the GUI log per refresh
+MAX_LOGGED_EDITS = 10
+# Commands that change the playlist and only mark the GUI for redrawing
+EDIT_COMMANDS = frozenset({'add', 'remove', 'rearrange', 'undo', 'redo'})
+
+
+def _require(name, value, kinds, optional=False):
+    if value is None and optional:
+        return
+    if not isinstance(kinds, tuple):
+        kinds = (kinds,)
+    # bool is an int subclass, but True is not a song index or a volume
+    if not isinstance(value, kinds) or (isinstance(value, bool) and bool not in kinds):
+        names = ' or '.join(kind.__name__ for kind in kinds)
+        article = 'an' if names[0] in 'aeiou' else 'a'
+        raise TypeError(f"{name} must be {article} {names}, got {type(value).__name__}")
+
+
+class PlayerController:
+    """Command handlers for a Playlist/MusicPlayer pair.
+
+    Handlers must run on the thread that owns the player (the Tk thread when
+    a GUI is attached); the bridges below take care of that.
+    """
+
+    def __init__(self, playlist, music_player, gui=None):
+        self.playlist = playlist
+        self.music_player = music_player
+        self.gui = gui
+        self.last_now_playing = None
+        # Remote edits since the GUI was last redrawn; see refresh_display
+        self.edit_messages = []
+        self.commands = {
+            'status': self.status,
+            'list': self.list_songs,
+            'add': self.add_song,
+            'remove': self.remove_song,
+            'rearrange': self.rearrange_song,
+            'undo': self.undo,
+            'redo': self.redo,
+            'play': self.play,
+            'pause': self.pause,
+            'resume': self.resume,
+            'toggle': self.toggle,
+            'stop': self.stop,
+            'next': self.next_song,
+            'prev': self.previous_song,
+            'volume': self.set_volume,
+            'shuffle': self.set_shuffle,
+        }
+
+    def execute(self, cmd, args):
+        handler = self.commands.get(cmd)
+        if handler is None:
+            raise ValueError(f"Unknown command: {cmd}")
+        if self.gui and cmd not in EDIT_COMMANDS:
+            # Navigation selects listbox rows, so pending edits must be drawn first
+            self.refresh_display()
+        return handler(**args)
+
+    def now_playing(self):
+        player = self.music_player
+        song = player.current_song
+        return {
+            'title': song.title if song else None,
+            'index': player.current_song_index if song else None,
+            'is_playing': player.is_playing,
+            'is_paused': player.is_paused,
+        }
+
+    def poll_now_playing(self):
+        """Return a now_playing event if playback changed since the last poll"""
+        state = self.now_playing()
+        if state == self.last_now_playing:
+            return None
+        self.last_now_playing = state
+        return dict(state, event='now_playing')
+
+    def status(self):
+        player = self.music_player
+        state = self.now_playing()
+        state.update({
+            'playlist': self.playlist.name,
+            'song_count': self.playlist.size,
+            'volume': player.volume,
+            'shuffle': player.shuffle_mode,
+        })
+        return state
+
+    def list_songs(self):
+        return self.playlist.play_sequentially()
+
+    def add_song(self, title, file_path=None):
+        _require('title', title, str)
+        _require('file_path', file_path, str, optional=True)
+        self.playlist.add_song(title, file_path)
+        self._refresh(f"Added song (remote): {title}")
+        return f"{title} added to playlist."
+
+    def remove_song(self, title):
+        _require('title', title, str)
+        result = self.playlist.remove_song(title)
+        self._refresh(result)
+        return result
+
+    def rearrange_song(self, old_title, new_title):
+        _require('old_title', old_title, str)
+        _require('new_title', new_title, str)
+        result = self.playlist.rearrange_song(old_title, new_title)
+        self._refresh(result)
+        return result
+
+    def undo(self):
+        result = self.playlist.undo()
+        self._refresh(result)
+        return result
+
+    def redo(self):
+        result = self.playlist.redo()
+        self._refresh(result)
+        return result
+
+    def play(self, index=None):
+        _require('index', index, int, optional=True)
+        player = self.music_player
+        if index is None:
+            if player.is_playing:
+                return self.now_playing()
+            if player.is_paused:
+                return self.resume()
+            if not self.gui:
+                self._play_index(player.current_song_index)
+                return self.now_playing()
+            # Same song the Play button would start: the selection, else the first
+            selection = self.gui.playlist_listbox.curselection()
+            index = selection[0] if selection else 0
+        songs = self.playlist.get_all_songs()
+        if not songs:
+            raise ValueError("Playlist is empty.")
+        if not 0 <= index < len(songs):
+            raise ValueError(f"Index out of range: {index}")
+        if self.gui:
+            song = songs[index]
+            if not (song.file_path and os.path.exists(song.file_path)):
+                # Checked here so the GUI's modal info box never blocks Tk
+                raise RuntimeError(f"Could not play: {song.title} (file not found or no file path)")
+            self.gui.playlist_listbox.selection_clear(0, 'end')
+            self.gui.playlist_listbox.selection_set(index)
+            self.gui.play_selected_song()
+        else:
+            self._play_index(index)
+        return self.now_playing()
+
+    def pause(self):
+        if self.music_player.is_playing:
+            if self.gui:
+                self.gui.toggle_play_pause()
+            else:
+                self.music_player.pause()
+        return self.now_playing()
+
+    def resume(self):
+        if self.music_player.is_paused:
+            if self.gui:
+                self.gui.toggle_play_pause()
+            else:
+                self.music_player.unpause()
+        return self.now_playing()
+
+    def toggle(self):
+        if self.music_player.is_playing:
+            return self.pause()
+        if self.music_player.is_paused:
+            return self.resume()
+        return self.play()
+
+    def stop(self):
+        if self.gui:
+            self.gui.stop_music()
+        else:
+            self.music_player.stop()
+        return self.now_playing()
+
+    def next_song(self):
+        if self.gui:
+            self.gui.next_song()
+        else:
+            index = self.music_player.get_next_index()
+            if index is not None:
+                self._play_index(index)
+        return self.now_playing()
+
+    def previous_song(self):
+        if self.gui:
+            self.gui.previous_song()
+        else:
+            index = self.music_player.get_prev_index()
+            if index is not None:
+                self._play_index(index)
+        return self.now_playing()
+
+    def set_volume(self, value):
+        _require('value', value, (int, float))
+        if not math.isfinite(value):
+            raise TypeError(f"value must be a finite number, got {value}")
+        value = max(0, min(100, int(value)))
+        if self.gui:
+            # The scale's command callback applies the volume and logs it
+            self.gui.volume_scale.set(value)
+        else:
+            self.music_player.set_volume(value / 100.0)
+        return value
+
+    def set_shuffle(self, enabled=True):
+        _require('enabled', enabled, bool)
+        if self.gui:
+            if enabled:
+                self.gui.play_shuffled()
+            else:
+                self.gui.play_sequential()
+        elif enabled:
+            self.music_player.enable_shuffle()
+        else:
+            self.music_player.disable_shuffle()
+        return self.music_player.shuffle_mode
+
+    def _play_index(self, index):
+        songs = self.playlist.get_all_songs()
+        if not 0 <= index < len(songs):
+            raise ValueError(f"Index out of range: {index}")
+        song = songs[index]
+        if not self.music_player.play_song(song):
+            raise RuntimeError(f"Could not play: {song.title}")
+        self.music_player.current_song_index = index
+
+    def refresh_display(self):
+        """Redraw the GUI once for all remote edits since the last call"""
+        if not self.edit_messages:
+            return
+        messages = self.edit_messages
+        self.edit_messages = []
+        self.gui.update_playlist_display()
+        if len(messages) > MAX_LOGGED_EDITS:
+            hidden = len(messages) - MAX_LOGGED_EDITS
+            messages = [f"({hidden} earlier remote edits not shown)"] + messages[-MAX_LOGGED_EDITS:]
+        self.gui.log_output("\n".join(messages))
+
+    def _refresh(self, message):
+        # Rebuilding the listbox is O(n), so it happens once per Tk tick
+        if self.gui:
+            self.edit_messages.append(message)
+
+
+class TkBridge:
+    """Runs submitted calls on the Tk thread by draining a queue from root.after.
+
+    Tk widgets may only be touched from the thread running mainloop, so the
+    control server hands work over here and awaits the returned future.
+    """
+
+    def __init__(self, root, interval_ms=10):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.pending = queue.SimpleQueue()
+        self.watchers = []
+
+    def start(self):
+        self.root.after(self.interval_ms, self._pump)
+
+    def submit(self, func, *args):
+        future = concurrent.futures.Future()
+        self.pending.put((future, func, args))
+        return future
+
+    def _pump(self):
+        backlog = False
+        try:
+            for _ in range(MAX_CALLS_PER_TICK):
+                try:
+                    future, func, args = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                _run(future, func, args)
+            else:
+                backlog = True
+            for watcher in self.watchers:
+                try:
+                    watcher()
+                except Exception as e:
+                    print(f"Error in control bridge watcher: {e}")
+        finally:
+            # Come back almost at once while a backlog remains; Tk still gets
+            # to handle its own events in between
+            self.root.after(1 if backlog else self.interval_ms, self._pump)
+
+
+class DirectBridge:
+    """Runs submitted calls immediately; used when no Tk loop is present"""
+
+    def __init__(self):
+        self.watchers = []
+
+    def start(self):
+        pass
+
+    def submit(self, func, *args):
+        future = concurrent.futures.Future()
+        _run(future, func, args)
+        for watcher in self.watchers:
+            watcher()
+        return future
+
+
+def _run(future, func, args):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+
+
+def _encode(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class ControlServer:
+    """Line-delimited JSON control server for a PlayerController.
+
+    Each request line is an object such as {"id": 1, "cmd": "next", "args": {}}
+    and is answered with {"id": 1, "ok": true, "result": ...} or
+    {"id": 1, "ok": false, "error": "..."}. Clients that send "subscribe"
+    additionally receive {"event": "now_playing", ...} lines whenever the
+    current song or play state changes.
+    """
+
+    def __init__(self, controller, bridge, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        self.controller = controller
+        self.bridge = bridge
+        self.host = host
+        self.port = port
+        self.path = path
+        self.loop = None
+        self.server = None
+        self.subscribers = set()
+        self.bridge.watchers.append(self._watch_now_playing)
+
+    @property
+    def address(self):
+        if self.path:
+            return self.path
+        return f"{self.host}:{self.port}"
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self.path:
+            if os.path.exists(self.path):
+                # Only clear a stale socket from an earlier run, never a regular file
+                if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+                    raise FileExistsError(f"{self.path} exists and is not a socket")
+                os.unlink(self.path)
+            self.server = await asyncio.start_unix_server(
+                self._handle_client, path=self.path,
+                limit=MAX_LINE_BYTES, backlog=DEFAULT_BACKLOG)
+        else:
+            self.server = await asyncio.start_server(
+                self._handle_client, self.host, self.port,
+                limit=MAX_LINE_BYTES, backlog=DEFAULT_BACKLOG)
+            if not self.port:
+                self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start_in_thread(self):
+        """Run the server on its own event loop thread and return once listening"""
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name='playlist-control', daemon=True)
+        thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return thread
+
+    def publish(self, event):
+        """Push an event to all subscribers; safe to call from any thread"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._broadcast, event)
+
+    def _watch_now_playing(self):
+        event = self.controller.poll_now_playing()
+        if event is not None:
+            self.publish(event)
+
+    def _broadcast(self, event):
+        data = _encode(event)
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+            elif writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                # Slow consumer; drop it rather than buffer without bound
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(_encode(await self._dispatch(line, writer)))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError is raised by readline when a line exceeds the limit
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, line, writer):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {'id': None, 'ok': False, 'error': f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': "Request must be a JSON object"}
+        request_id = request.get('id')
+        cmd = request.get('cmd')
+        args = request.get('args') or {}
+        if not isinstance(args, dict):
+            return {'id': request_id, 'ok': False, 'error': "args must be a JSON object"}
+
+        # Connection-level commands never need the player thread
+        if cmd == 'ping':
+            return {'id': request_id, 'ok': True, 'result': 'pong'}
+        if cmd == 'subscribe':
+            self.subscribers.add(writer)
+            result = await asyncio.wrap_future(self.bridge.submit(self.controller.now_playing))
+            return {'id': request_id, 'ok': True, 'result': result}
+        if cmd == 'unsubscribe':
+            self.subscribers.discard(writer)
+            return {'id': request_id, 'ok': True, 'result': None}
+
+        try:
+            future = self.bridge.submit(self.controller.execute, cmd, args)
+            result = await asyncio.wrap_future(future)
+        except TypeError as e:
+            return {'id': request_id, 'ok': False, 'error': f"Bad arguments for {cmd}: {e}"}
+        except Exception as e:
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+        return {'id': request_id, 'ok': True, 'result': result}
+
+
+def start_gui_control_server(gui, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+    """Attach a control server to a running PlaylistGUI without blocking Tk"""
+    controller = PlayerController(gui.playlist, gui.music_player, gui)
+    bridge = TkBridge(gui.root)
+    bridge.watchers.append(controller.refresh_display)
+    server = ControlServer(controller, bridge, host=host, port=port, path=path)
+    # root.after must be called from the Tk thread, never the server's loop thread
+    bridge.start()
+    server.start_in_thread()
+    return server
+
+
+def raise_fd_limit():
+    """Lift the soft open-file limit to the hard limit so many clients fit"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless playlist control server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument('--songs', type=int, default=0, help="Pre-fill the playlist with N placeholder songs")
+    args = parser.parse_args()
+
+    from music_playlist_adt import Playlist, MusicPlayer
+
+    raise_fd_limit()
+    playlist = Playlist("Remote")
+    for i in range(args.songs):
+        playlist.add_song(f"Song {i + 1}")
+    music_player = MusicPlayer()
+    music_player.playlist = playlist
+
+    controller = PlayerController(playlist, music_player)
+    bridge = DirectBridge()
+    server = ControlServer(controller, bridge, host=args.host, port=args.port, path=args.socket)
+    bridge.start()
+    print(f"Control server listening on {server.address}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
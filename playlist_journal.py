@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+
+# Take a snapshot (and compact the log behind it) after this many ops
+DEFAULT_SNAPSHOT_EVERY = 10000
+
+
+def _encode(op):
+    return json.dumps(op, separators=(',', ':')) + '\n'
+
+
+class PlaylistJournal:
+    """Append-only operation log with periodic snapshots for a Playlist.
+
+    Every mutation is written as one JSON line holding a positional op
+    ({"v": 7, "op": "insert" | "remove" | "replace", "index": ...}), so
+    undo and redo are logged as the concrete edit they made. Recovery loads
+    the newest snapshot and replays only the ops logged after it.
+
+    The previous snapshot is kept too, and compaction only drops ops older
+    than it, so at least snapshot_every versions can always be diffed. The
+    ops in that window are also held in memory for diff().
+    """
+
+    def __init__(self, path, snapshot_every=DEFAULT_SNAPSHOT_EVERY, sync=False):
+        self.path = path
+        self.snapshot_path = path + '.snapshot'
+        self.previous_snapshot_path = path + '.snapshot.prev'
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        self.version = 0
+        self.snapshot_version = 0
+        self.previous_snapshot_version = 0
+        # Contiguous ops after previous_snapshot_version (or more, if a
+        # compaction has not finished), oldest first
+        self.ops = []
+        self.lock = threading.Lock()
+        self.worker = None
+        self.file = None
+
+    def recover(self, name="My Favorites"):
+        """Rebuild the playlist from disk and start journaling its mutations"""
+        from music_playlist_adt import Playlist
+
+        playlist = Playlist(name)
+        previous = self._read_snapshot(self.previous_snapshot_path)
+        snapshot = self._read_snapshot(self.snapshot_path)
+        if snapshot is None:
+            # A crash while rotating snapshots can leave only the previous one;
+            # the log still holds every op after it
+            snapshot, previous = previous, None
+        if previous:
+            self.previous_snapshot_version = previous['version']
+        if snapshot:
+            playlist.name = snapshot['name']
+            for title, file_path in snapshot['songs']:
+                playlist.add_song(title, file_path)
+            playlist.undo_stack.clear()
+            self.version = self.snapshot_version = snapshot['version']
+        ops, end = self._read_ops()
+        self.ops = ops
+        for op in ops:
+            if op['v'] > self.version:
+                playlist.apply_op(op)
+                self.version = op['v']
+        if os.path.exists(self.path) and os.path.getsize(self.path) > end:
+            os.truncate(self.path, end)
+        self.attach(playlist)
+        return playlist
+
+    def attach(self, playlist):
+        self.file = open(self.path, 'a', encoding='utf-8')
+        playlist.journal = self
+
+    def record(self, playlist, op):
+        self.version += 1
+        op = dict(op, v=self.version)
+        self.ops.append(op)
+        with self.lock:
+            self.file.write(_encode(op))
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+        if self.version - self.snapshot_version >= self.snapshot_every:
+            self.snapshot(playlist)
+
+    def snapshot(self, playlist):
+        """Capture the playlist now; write it and compact the log in the background"""
+        if self.worker is not None and self.worker.is_alive():
+            # The next threshold crossing will pick up whatever this one misses
+            return False
+        songs = [(song.title, song.file_path) for song in playlist.get_all_songs()]
+        state = {'name': playlist.name, 'version': self.version, 'songs': songs}
+        # The snapshot being replaced becomes the oldest diffable version
+        self.previous_snapshot_version = self.snapshot_version
+        self.snapshot_version = self.version
+        self.ops = [op for op in self.ops if op['v'] > self.previous_snapshot_version]
+        self.worker = threading.Thread(target=self._write_snapshot_and_compact,
+                                       args=(state, self.previous_snapshot_version), name='playlist-journal', daemon=True)
+        self.worker.start()
+        return True
+
+    def diff(self, from_version, to_version=None):
+        """Return the ops that turn version from_version into to_version"""
+        if to_version is None:
+            to_version = self.version
+        if not 0 <= from_version <= to_version <= self.version:
+            raise ValueError(f"Cannot diff from {from_version} to {to_version} (latest is {self.version})")
+        oldest = self.ops[0]['v'] - 1 if self.ops else self.version
+        if from_version < oldest:
+            raise ValueError(f"Versions before {oldest} are no longer kept")
+        return self.ops[from_version - oldest:to_version - oldest]
+
+    def wait(self):
+        if self.worker is not None:
+            self.worker.join()
+
+    def close(self):
+        self.wait()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _read_snapshot(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_ops(self):
+        """Return the logged ops and the byte offset just past the last whole line"""
+        if not os.path.exists(self.path):
+            return [], 0
+        with self.lock, open(self.path, 'rb') as f:
+            data = f.read()
+        ops = []
+        end = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                # A torn final line from a crash mid-write
+                break
+            ops.append(json.loads(line))
+            end += len(line)
+        return ops, end
+
+    def _write_snapshot_and_compact(self, state, keep_after):
+        # Runs on a daemon thread, so report failures instead of losing them
+        tmp_paths = (self.snapshot_path + '.tmp', self.path + '.tmp')
+        try:
+            with open(tmp_paths[0], 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.snapshot_path):
+                os.replace(self.snapshot_path, self.previous_snapshot_path)
+            os.replace(tmp_paths[0], self.snapshot_path)
+            self._compact(keep_after)
+        except Exception as e:
+            print(f"Error writing journal snapshot: {e}")
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _compact(self, covered_version):
+        end = self._rewrite_log(covered_version)
+        self._swap_log(end)
+
+    def _rewrite_log(self, covered_version):
+        """Copy ops after covered_version to the .tmp log; return the bytes read"""
+        # Done without holding the lock, so edits keep flowing meanwhile
+        with open(self.path, 'rb') as src, open(self.path + '.tmp', 'wb') as dst:
+            with self.lock:
+                end = os.path.getsize(self.path)
+            while src.tell() < end:
+                line = src.readline()
+                if json.loads(line)['v'] > covered_version:
+                    dst.write(line)
+        return end
+
+    def _swap_log(self, end):
+        """Append what was logged after end to the .tmp log and swap it in"""
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            with open(self.path, 'rb') as src, open(tmp_path, 'ab') as dst:
+                src.seek(end)
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            # Windows cannot replace a file that is still open
+            self.file.close()
+            try:
+                os.replace(tmp_path, self.path)
+            finally:
+                self.file = open(self.path, 'a', encoding='utf-8')
@@ -0,0 +1,234 @@
+import json
+import socket
+import threading
+import time
+import tkinter
+
+import pytest
+
+from playlist_control import (MAX_CALLS_PER_TICK, ControlServer, DirectBridge, PlayerController, TkBridge,
+                              start_gui_control_server)
+
+
+class FakeSong:
+    def __init__(self, title, file_path=None):
+        self.title = title
+        self.file_path = file_path
+
+
+class FakePlaylist:
+    def __init__(self, titles):
+        self.name = "Test"
+        self.songs = [FakeSong(title) for title in titles]
+        self.size = len(self.songs)
+
+    def get_all_songs(self):
+        return list(self.songs)
+
+    def add_song(self, title, file_path=None):
+        self.songs.append(FakeSong(title, file_path))
+        self.size += 1
+
+    def play_sequentially(self):
+        return [song.title for song in self.songs]
+
+
+class FakePlayer:
+    current_song = None
+    current_song_index = 0
+    is_playing = False
+    is_paused = False
+    volume = 0.7
+    shuffle_mode = False
+
+
+class FakeListbox:
+    def curselection(self):
+        return ()
+
+    def selection_clear(self, first, last):
+        pass
+
+    def selection_set(self, index):
+        pass
+
+
+class FakeGUI:
+    def __init__(self, root=None):
+        self.root = root
+        self.playlist = FakePlaylist(["A", "B"])
+        self.music_player = FakePlayer()
+        self.playlist_listbox = FakeListbox()
+        self.calls = []
+
+    def toggle_play_pause(self):
+        self.calls.append('toggle_play_pause')
+
+    def play_selected_song(self):
+        self.calls.append('play_selected_song')
+
+    def update_playlist_display(self):
+        self.calls.append('update_playlist_display')
+
+    def log_output(self, message):
+        self.calls.append(('log_output', message))
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append(ms)
+
+
+def request(port, message, replies):
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+        replies.append(json.loads(sock.makefile(encoding='utf-8').readline()))
+
+
+def test_gui_control_server_answers_through_tk_loop():
+    # Tcl without Tk still has the event loop and threading rules of a GUI root
+    root = tkinter.Tcl()
+    gui = FakeGUI(root)
+    server = start_gui_control_server(gui, port=0)
+
+    replies = []
+    client = threading.Thread(target=request, args=(server.port, {'id': 1, 'cmd': 'status'}, replies))
+    client.start()
+    # Stand in for mainloop: the request is only answered once Tk runs the pump
+    deadline = time.monotonic() + 5
+    while client.is_alive() and time.monotonic() < deadline:
+        root.update()
+        time.sleep(0.005)
+    client.join(1)
+
+    assert replies == [{'id': 1, 'ok': True, 'result': {
+        'title': None, 'index': None, 'is_playing': False, 'is_paused': False,
+        'playlist': "Test", 'song_count': 2, 'volume': 0.7, 'shuffle': False,
+    }}]
+
+
+def test_play_while_playing_does_not_pause():
+    gui = FakeGUI()
+    gui.music_player.is_playing = True
+    controller = PlayerController(gui.playlist, gui.music_player, gui)
+
+    controller.play()
+
+    assert gui.calls == []
+
+
+@pytest.mark.parametrize('cmd', ['play', 'toggle'])
+def test_play_song_without_file_is_refused_before_gui(cmd):
+    # The GUI would open a modal info box here and stall every remote client
+    gui = FakeGUI()
+    controller = PlayerController(gui.playlist, gui.music_player, gui)
+
+    with pytest.raises(RuntimeError, match="Could not play: A"):
+        controller.execute(cmd, {})
+
+    assert gui.calls == []
+
+
+@pytest.mark.parametrize('cmd, args, message', [
+    ('add', {'title': ["a"]}, "title must be a str, got list"),
+    ('add', {'title': "a", 'file_path': 1}, "file_path must be a str, got int"),
+    ('remove', {'title': 3}, "title must be a str, got int"),
+    ('rearrange', {'old_title': "A", 'new_title': None}, "new_title must be a str, got NoneType"),
+    ('play', {'index': "1"}, "index must be an int, got str"),
+    ('play', {'index': True}, "index must be an int, got bool"),
+    ('volume', {'value': "abc"}, "value must be an int or float, got str"),
+    ('volume', {'value': True}, "value must be an int or float, got bool"),
+    ('volume', {'value': float('nan')}, "value must be a finite number"),
+    ('shuffle', {'enabled': "no"}, "enabled must be a bool, got str"),
+    ('shuffle', {'enabled': 0}, "enabled must be a bool, got int"),
+])
+def test_argument_types_are_checked(cmd, args, message):
+    gui = FakeGUI()
+    controller = PlayerController(gui.playlist, gui.music_player, gui)
+
+    with pytest.raises(TypeError, match=message):
+        controller.execute(cmd, args)
+
+    assert gui.playlist.play_sequentially() == ["A", "B"]
+
+
+def test_pump_caps_calls_per_tick_and_comes_back_for_the_rest():
+    root = FakeRoot()
+    bridge = TkBridge(root, interval_ms=10)
+    futures = [bridge.submit(lambda i=i: i) for i in range(MAX_CALLS_PER_TICK + 5)]
+
+    bridge._pump()
+    assert sum(f.done() for f in futures) == MAX_CALLS_PER_TICK
+    assert root.scheduled == [1]
+
+    bridge._pump()
+    assert all(f.done() for f in futures)
+    assert root.scheduled == [1, 10]
+
+
+def test_pump_keeps_running_when_a_watcher_raises():
+    root = FakeRoot()
+    bridge = TkBridge(root)
+
+    def broken():
+        raise RuntimeError("boom")
+    bridge.watchers.append(broken)
+    bridge._pump()
+    future = bridge.submit(lambda: "ok")
+    bridge._pump()
+
+    assert root.scheduled == [10, 10]
+    assert future.result(0) == "ok"
+
+
+def test_remote_edits_redraw_the_gui_once_per_tick():
+    gui = FakeGUI()
+    controller = PlayerController(gui.playlist, gui.music_player, gui)
+    for i in range(50):
+        controller.execute('add', {'title': f"S{i}"})
+    assert gui.calls == []
+
+    controller.refresh_display()
+    controller.refresh_display()
+
+    assert gui.calls[0] == 'update_playlist_display'
+    assert len(gui.calls) == 2
+    logged = gui.calls[1][1].splitlines()
+    assert logged[0] == "(40 earlier remote edits not shown)"
+    assert logged[-1] == "Added song (remote): S49"
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+def test_socket_path_that_is_a_regular_file_is_not_deleted(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text("keep me")
+    gui = FakeGUI()
+    server = ControlServer(PlayerController(gui.playlist, gui.music_player), DirectBridge(), path=str(path))
+
+    with pytest.raises(FileExistsError, match="is not a socket"):
+        server.start_in_thread()
+
+    assert path.read_text() == "keep me"
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / 'control.sock')
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    gui = FakeGUI()
+    server = ControlServer(PlayerController(gui.playlist, gui.music_player), DirectBridge(), path=path)
+
+    server.start_in_thread()
+
+    replies = []
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(5)
+        sock.connect(path)
+        sock.sendall(b'{"id":1,"cmd":"list"}\n')
+        replies.append(json.loads(sock.makefile(encoding='utf-8').readline()))
+    assert replies == [{'id': 1, 'ok': True, 'result': ["A", "B"]}]
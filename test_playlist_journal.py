@@ -0,0 +1,223 @@
+import json
+import os
+import random
+from collections import deque
+
+import pytest
+
+# music_playlist_adt imports both at module level
+pytest.importorskip('numpy')
+pytest.importorskip('pygame')
+
+from music_playlist_adt import Playlist
+from playlist_journal import PlaylistJournal
+
+
+def titles(playlist):
+    return playlist.play_sequentially()
+
+
+def assert_links(playlist):
+    forward = titles(playlist)
+    backward = []
+    current = playlist.tail
+    while current:
+        backward.append(current.title)
+        current = current.prev
+    assert backward == forward[::-1]
+    assert playlist.size == len(forward)
+    if forward:
+        assert playlist.head.prev is None and playlist.tail.next is None
+    else:
+        assert playlist.head is None and playlist.tail is None
+
+
+def random_edit(playlist, rng, step):
+    current = titles(playlist)
+    roll = rng.random()
+    if roll < 0.35 or not current:
+        playlist.add_song(f"S{rng.randrange(8)}", f"/music/{step}.wav")
+    elif roll < 0.5:
+        playlist.remove_song(rng.choice(current + ["missing"]))
+    elif roll < 0.6:
+        playlist.rearrange_song(rng.choice(current), f"R{step}")
+    elif roll < 0.8:
+        playlist.undo()
+    else:
+        playlist.redo()
+
+
+def new_journal(tmp_path, **kwargs):
+    return PlaylistJournal(str(tmp_path / 'playlist.log'), **kwargs)
+
+
+def test_rearrange_song_keeps_position():
+    playlist = Playlist("Test")
+    for title in "ABC":
+        playlist.add_song(title)
+
+    assert playlist.rearrange_song("B", "X") == "B replaced with X."
+    assert titles(playlist) == ["A", "X", "C"]
+    playlist.undo()
+    assert titles(playlist) == ["A", "B", "C"]
+    playlist.redo()
+    assert titles(playlist) == ["A", "X", "C"]
+    assert_links(playlist)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_undo_redo_matches_model_with_capped_history(seed):
+    limit = 4
+    rng = random.Random(seed)
+    playlist = Playlist("Test", history_limit=limit)
+    # Reference model: whole-list states, capped the same way
+    model, undo, redo = [], deque(maxlen=limit), deque(maxlen=limit)
+
+    for step in range(500):
+        before = list(model)
+        state = rng.getstate()
+        random_edit(playlist, rng, step)
+        rng.setstate(state)
+        roll = rng.random()
+        edited = roll < 0.6 or not before
+        if roll < 0.35 or not before:
+            model.append(f"S{rng.randrange(8)}")
+        elif roll < 0.5:
+            title = rng.choice(before + ["missing"])
+            if title in model:
+                model.remove(title)
+        elif roll < 0.6:
+            title = rng.choice(before)
+            model[model.index(title)] = f"R{step}"
+        elif roll < 0.8:
+            if undo:
+                redo.append(model)
+                model = undo.pop()
+        else:
+            if redo:
+                undo.append(model)
+                model = redo.pop()
+        if edited and model != before:
+            undo.append(before)
+            redo.clear()
+
+        assert titles(playlist) == model
+        assert_links(playlist)
+
+
+def test_recovered_playlist_matches_after_random_edits(tmp_path):
+    rng = random.Random(1)
+    journal = new_journal(tmp_path, snapshot_every=7)
+    playlist = journal.recover()
+    for step in range(400):
+        random_edit(playlist, rng, step)
+    expected = titles(playlist)
+    journal.close()
+
+    recovered = new_journal(tmp_path).recover()
+    assert titles(recovered) == expected
+    assert [s.file_path for s in recovered.get_all_songs()] == [s.file_path for s in playlist.get_all_songs()]
+    assert_links(recovered)
+    recovered.journal.close()
+
+
+def test_torn_final_line_is_truncated_and_later_appends_replay(tmp_path):
+    journal = new_journal(tmp_path)
+    playlist = journal.recover()
+    for title in "ABC":
+        playlist.add_song(title)
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"op":"insert","index":3,"ti')
+
+    journal = new_journal(tmp_path)
+    playlist = journal.recover()
+    assert titles(playlist) == ["A", "B", "C"]
+    playlist.add_song("D")
+    journal.close()
+
+    journal = new_journal(tmp_path)
+    assert titles(journal.recover()) == ["A", "B", "C", "D"]
+    journal.close()
+
+
+def test_recovery_after_crash_between_snapshot_and_compaction(tmp_path, monkeypatch):
+    journal = new_journal(tmp_path, snapshot_every=5)
+    # The snapshot lands on disk but the log is never compacted
+    monkeypatch.setattr(journal, '_compact', lambda keep_after: None)
+    playlist = journal.recover()
+    for i in range(12):
+        playlist.add_song(f"S{i}")
+        journal.wait()
+    playlist.remove_song("S3")
+    journal.close()
+
+    journal = new_journal(tmp_path)
+    playlist = journal.recover()
+    assert titles(playlist) == [f"S{i}" for i in range(12) if i != 3]
+    assert journal.version == 13
+    journal.close()
+
+
+def test_recovery_when_only_previous_snapshot_survived(tmp_path):
+    journal = new_journal(tmp_path, snapshot_every=4)
+    playlist = journal.recover()
+    for i in range(10):
+        playlist.add_song(f"S{i}")
+        journal.wait()
+    journal.close()
+    # Crash after rotating the current snapshot away, before writing the new one
+    os.remove(journal.snapshot_path)
+
+    journal = new_journal(tmp_path)
+    assert titles(journal.recover()) == [f"S{i}" for i in range(10)]
+    journal.close()
+
+
+def test_ops_logged_during_compaction_survive_the_swap(tmp_path, monkeypatch):
+    journal = new_journal(tmp_path, snapshot_every=10)
+    # Compaction is driven by hand below
+    monkeypatch.setattr(journal, '_compact', lambda keep_after: None)
+    playlist = journal.recover()
+    for i in range(20):
+        playlist.add_song(f"S{i}")
+        journal.wait()
+    assert (journal.previous_snapshot_version, journal.snapshot_version) == (10, 20)
+
+    end = journal._rewrite_log(10)
+    # Edits that arrive between the unlocked rewrite and the swap
+    playlist.add_song("Late")
+    playlist.remove_song("S0")
+    journal._swap_log(end)
+    playlist.add_song("After")
+    journal.close()
+
+    with open(journal.path, encoding='utf-8') as f:
+        assert [json.loads(line)['v'] for line in f] == list(range(11, 24))
+    journal = new_journal(tmp_path)
+    assert titles(journal.recover()) == [f"S{i}" for i in range(1, 20)] + ["Late", "After"]
+    journal.close()
+
+
+def test_diff_reaches_back_past_the_latest_snapshot(tmp_path):
+    journal = new_journal(tmp_path, snapshot_every=10)
+    playlist = journal.recover()
+    for i in range(10):
+        playlist.add_song(f"S{i}")
+    journal.wait()
+
+    assert [op['title'] for op in journal.diff(5, 10)] == [f"S{i}" for i in range(5, 10)]
+
+    for i in range(15):
+        playlist.add_song(f"T{i}")
+    journal.wait()
+    assert len(journal.diff(10)) == 15
+    with pytest.raises(ValueError, match="no longer kept"):
+        journal.diff(5)
+    journal.close()
+
+    # The diffable window survives recovery
+    journal = new_journal(tmp_path)
+    journal.recover()
+    assert [op['title'] for op in journal.diff(20, 25)] == [f"T{i}" for i in range(10, 15)]
+    journal.close()